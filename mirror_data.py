@@ -1,134 +1,254 @@
 #!/usr/bin/env python3
 # mirror_data.py
 
+import aiohttp
+import asyncio
 import requests
 import os
 import hashlib
-import json
+import orjson
+import queue
+import re
+import threading
+import xxhash
 import sys
 import time
 from datetime import datetime
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+import lxml.etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Error banners live in the page head, so scanning the first few KB is enough
+_ERROR_PAGE_RE = re.compile(rb'<title>404|<title>error|page not found|server error occurred', re.IGNORECASE)
 
 class DataMirror:
+    # Directory-listing links that never point at content
+    _SKIP_LINKS = frozenset(('..', '../', '/', ''))
+
+    # Scanner threads share the requests session; keep this comfortably
+    # below the adapter's pool_maxsize so no thread waits for a socket
+    _SCAN_WORKERS = 8
+
     def __init__(self, base_url="https://data.bzerox.org/mainnet/", local_dir="data"):
         self.base_url = base_url.rstrip('/') + '/'
+        self._base_path = urlparse(self.base_url).path
         self.local_dir = local_dir
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'DataMirror/1.0 (GitHub Backup Bot)'
+            'User-Agent': 'DataMirror/1.0 (GitHub Backup Bot)',
+            'Connection': 'keep-alive'
         })
+        # Pool keep-alive connections and retry transient errors with jittered
+        # exponential backoff, so callers don't need their own retry loops
+        retry = Retry(
+            total=3,
+            backoff_factor=1.0,
+            backoff_jitter=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD'])
+        )
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.stats = {
             'downloaded': 0,
             'updated': 0,
             'errors': 0,
             'skipped': 0
         }
+        # Stats are updated from scanner threads and download workers
+        self._stats_lock = threading.Lock()
         self.files_found = []
-        
+
+        # Normalized URLs already queued or collected, so misconfigured
+        # listings can't make us fetch the same file twice or loop
+        self._seen_urls = set()
+
+        # Listing bodies already fetched by the availability probe,
+        # reused (once) by get_directory_listing
+        self._listing_cache = {}
+
+        # MD5s computed while saving downloads, so create_index doesn't
+        # have to re-read files it just wrote
+        self._hash_cache = {}
+
+        # Persistent hash cache from the previous run, keyed by rel_path and
+        # validated against size/mtime so untouched files never get re-read
+        self._disk_hash_cache = {}
+        try:
+            with open(os.path.join(local_dir, '.hash_cache.json'), 'rb') as f:
+                self._disk_hash_cache = orjson.loads(f.read())
+        except (OSError, ValueError):
+            pass
+
+        # Directories already created this run, so each one costs
+        # the mkdir syscalls only once
+        self._mkdir_cache = set()
+        self._mkdir_lock = threading.Lock()
+
+        # Conditional-request state: validators from the previous run's index,
+        # and the validators seen on this run's responses
+        self._prev_files = {}
+        self._file_headers = {}
+        try:
+            with open(os.path.join(local_dir, 'index.json'), 'rb') as f:
+                for entry in orjson.loads(f.read()).get('files', []):
+                    self._prev_files[entry['path']] = entry
+        except (OSError, ValueError):
+            pass
+
+
         # Alternative source for comparison and fallback
         self.alt_base_url = "https://b0x-token.github.io/B0x_Scripts_auto_2/mainnetB0x/"
         self.primary_available = False
         self.alt_available = False
         
     def test_server_availability(self, url, name="Server", is_github_pages=False):
-        """Test if a source server is responding with content"""
-        max_retries = 3
-        base_timeout = 10
-        
-        for attempt in range(max_retries):
-            try:
-                timeout = base_timeout * (attempt + 1)
-                print(f"  Attempt {attempt + 1}/{max_retries} (timeout: {timeout}s)...", end=" ")
-                
-                response = self.session.get(url, timeout=timeout)
-                response.raise_for_status()
-                
-                # Check if we get actual content
-                if len(response.content) < 100:
-                    print(f"minimal content ({len(response.content)} bytes)")
-                    if attempt < max_retries - 1:
-                        time.sleep(2 ** attempt)
-                        continue
+        """Test if a source server is responding with content
+
+        Transient failures are retried at the adapter level with jittered
+        exponential backoff, so there's no retry loop here.
+        """
+        try:
+            response = self.session.get(url, timeout=(5, 30))
+
+            # Check if we get actual content
+            if len(response.content) < 100:
+                print(f"  minimal content ({len(response.content)} bytes)")
+                return False
+
+            # Keep the body: if this source gets mirrored, the first
+            # listing fetch for this URL can reuse it
+            self._listing_cache[url] = response.content
+
+            # For GitHub Pages, be more lenient with error detection
+            if is_github_pages:
+                # HTTP errors are still definitive - the GH Pages 404 page
+                # contains dotted links that fool the file-links heuristic
+                if response.status_code >= 400:
+                    print(f"  HTTP error {response.status_code}")
                     return False
-                
-                # For GitHub Pages, be more lenient with error detection
-                if is_github_pages:
-                    # Try to parse as directory listing
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    links = soup.find_all('a', href=True)
-                    
-                    # If we find file links, it's likely a valid directory
-                    file_links = [link for link in links if '.' in link.get('href', '')]
-                    if len(file_links) > 0:
-                        print(f"valid directory with {len(file_links)} files ({len(response.content)} bytes)")
-                        return True
-                    
-                    # Check if it's a GitHub 404 page (these have specific markers)
-                    if 'github.io' in url.lower() and response.status_code == 404:
-                        print("GitHub 404 page detected")
-                        return False
-                    
-                    # If it has HTML structure but no obvious errors, consider it valid
-                    if soup.find('html') and not soup.find(text=lambda t: '404' in str(t).lower()):
-                        print(f"appears valid ({len(response.content)} bytes)")
-                        return True
-                else:
-                    # For regular servers, check for actual HTTP error pages
-                    # Only flag as error if we have HTTP error status OR obvious error content
-                    content_lower = response.text.lower()
-                    
-                    # Only check for error indicators if status code suggests an error
-                    if response.status_code >= 400:
-                        print(f"HTTP error {response.status_code}")
-                        if attempt < max_retries - 1:
-                            time.sleep(2 ** attempt)
-                            continue
-                        return False
-                    
-                    # For successful status codes, check for obvious error pages
-                    strict_error_indicators = ['<title>404', '<title>error', 'page not found', 'server error occurred']
-                    if any(indicator in content_lower for indicator in strict_error_indicators):
-                        print("error page detected")
-                        if attempt < max_retries - 1:
-                            time.sleep(2 ** attempt)
-                            continue
-                        return False
-                
-                print(f"responding normally ({len(response.content)} bytes)")
-                return True
-                
-            except requests.exceptions.Timeout as e:
-                print(f"timeout")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
-                    continue
-            except requests.exceptions.ConnectionError as e:
-                print(f"connection failed")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
-                    continue
-            except Exception as e:
-                print(f"error: {str(e)[:100]}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
-                    continue
-        
-        print(f"  {name} unavailable after {max_retries} attempts")
-        return False
+
+                # Try to parse as directory listing
+                doc = lxml.etree.fromstring(response.content, lxml.etree.HTMLParser())
+                links = [] if doc is None else [a.get('href') for a in doc.iter('a') if a.get('href')]
+
+                # If we find file links, it's likely a valid directory
+                file_links = [href for href in links if '.' in href]
+                if len(file_links) > 0:
+                    print(f"  valid directory with {len(file_links)} files ({len(response.content)} bytes)")
+                    return True
+
+                # Check if it's a GitHub 404 page (these have specific markers)
+                if 'github.io' in url.lower() and response.status_code == 404:
+                    print("  GitHub 404 page detected")
+                    return False
+
+                # If it has HTML structure but no obvious errors, consider it valid
+                if doc is not None and not any('404' in text for text in doc.itertext()):
+                    print(f"  appears valid ({len(response.content)} bytes)")
+                    return True
+            else:
+                # For regular servers, check for actual HTTP error pages
+                if response.status_code >= 400:
+                    print(f"  HTTP error {response.status_code}")
+                    return False
+
+                # For successful status codes, check for obvious error pages
+                # (scan raw bytes - no full-body decode or lowercase copy)
+                if _ERROR_PAGE_RE.search(response.content[:4096]):
+                    print("  error page detected")
+                    return False
+
+            print(f"  responding normally ({len(response.content)} bytes)")
+            return True
+
+        except Exception as e:
+            print(f"  error: {str(e)[:100]}")
+            print(f"  {name} unavailable")
+            return False
     
+    def _bump_stat(self, key):
+        """Thread-safe increment of a stats counter"""
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _ensure_dir(self, dirpath):
+        """Create a directory once per run, remembering what already exists"""
+        with self._mkdir_lock:
+            if dirpath not in self._mkdir_cache:
+                os.makedirs(dirpath, exist_ok=True)
+                self._mkdir_cache.add(dirpath)
+
     def get_file_hash(self, filepath):
-        """Get MD5 hash of local file"""
-        if not os.path.exists(filepath):
+        """Get MD5 hash of local file, reading in chunks to keep memory flat
+
+        Only used for the public index.json entries; change detection uses
+        get_content_hash which is much faster.
+        """
+        try:
+            with open(filepath, 'rb') as f:
+                if hasattr(hashlib, 'file_digest'):
+                    # Python 3.11+: hashes in C straight from the file, no
+                    # Python-level chunk loop or intermediate bytes objects
+                    return hashlib.file_digest(f, 'md5').hexdigest()
+                hasher = hashlib.md5()
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    hasher.update(chunk)
+                return hasher.hexdigest()
+        except FileNotFoundError:
             return None
-        with open(filepath, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
+
+    def get_content_hash(self, filepath):
+        """Get xxh3 hash of local file for change detection (not a security hash)"""
+        hasher = xxhash.xxh3_128()
+        try:
+            with open(filepath, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    hasher.update(chunk)
+        except FileNotFoundError:
+            return None
+        return hasher.hexdigest()
+
+    def _fetch_comparison_source(self, url, filename, local_path):
+        """Fetch one comparison file, conditionally when this URL won last run
+
+        Returns (raw_bytes, parsed_json, validators). On a 304 the local
+        copy is reused instead of downloading the body again.
+        """
+        headers = {}
+        prev = self._prev_files.get(filename) or {}
+        if prev.get('source_url') == url and os.path.exists(local_path):
+            if prev.get('etag'):
+                headers['If-None-Match'] = prev['etag']
+            if prev.get('last_modified'):
+                headers['If-Modified-Since'] = prev['last_modified']
+
+        response = self.session.get(url, timeout=30, headers=headers or None)
+        if response.status_code == 304:
+            # Source unchanged since our local copy was written
+            print(f"  Source unchanged (304), reusing local copy")
+            with open(local_path, 'rb') as f:
+                raw = f.read()
+            return raw, orjson.loads(raw), prev
+
+        response.raise_for_status()
+        raw = response.content
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'source_url': url
+        }
+        return raw, orjson.loads(raw), validators
 
     def compare_json_sources(self, filename):
         """Compare JSON files from both sources and return the one with the most recent block/timestamp"""
         primary_url = urljoin(self.base_url, filename)
         alt_url = urljoin(self.alt_base_url, filename)
+        local_path = os.path.join(self.local_dir, filename)
         
         print(f"\nComparing {filename} from both sources...")
         
@@ -145,16 +265,31 @@ class DataMirror:
         
         primary_data = None
         alt_data = None
+        primary_raw = None
+        alt_raw = None
+        primary_validators = None
+        alt_validators = None
         primary_value = None
         alt_value = None
-        
-        # Try to fetch from primary source (if available)
+
+        # Fetch both sources at once - they're independent hosts, so the
+        # comparison only costs the slower of the two round trips
+        futures = {}
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            if self.primary_available:
+                futures['primary'] = executor.submit(
+                    self._fetch_comparison_source, primary_url, filename, local_path)
+            if self.alt_available:
+                futures['alt'] = executor.submit(
+                    self._fetch_comparison_source, alt_url, filename, local_path)
+
+        # Collect primary result (if available)
         if self.primary_available:
             try:
-                response = self.session.get(primary_url, timeout=30)
-                response.raise_for_status()
-                primary_data = response.json()
-                
+                # Keep the server's own bytes so the winner is written verbatim
+                # and the hash compare against the local copy can short-circuit
+                primary_raw, primary_data, primary_validators = futures['primary'].result()
+
                 if is_timestamp_array:
                     # Get last timestamp from array
                     timestamps = primary_data.get(comparison_field, [])
@@ -170,13 +305,11 @@ class DataMirror:
         else:
             print(f"  Primary source unavailable, skipping")
         
-        # Try to fetch from alternative source (if available)
+        # Collect alternative result (if available)
         if self.alt_available:
             try:
-                response = self.session.get(alt_url, timeout=30)
-                response.raise_for_status()
-                alt_data = response.json()
-                
+                alt_raw, alt_data, alt_validators = futures['alt'].result()
+
                 if is_timestamp_array:
                     # Get last timestamp from array
                     timestamps = alt_data.get(comparison_field, [])
@@ -198,83 +331,167 @@ class DataMirror:
             return None, None
         elif primary_data is None:
             print(f"  Using alternative source (primary unavailable)")
-            return alt_data, alt_url
+            self._file_headers[filename] = alt_validators
+            return alt_raw, alt_url
         elif alt_data is None:
             print(f"  Using primary source (alternative unavailable)")
-            return primary_data, primary_url
+            self._file_headers[filename] = primary_validators
+            return primary_raw, primary_url
         elif alt_value > primary_value:
             print(f"  Using alternative source ({comparison_field}: {alt_value} > {primary_value})")
-            return alt_data, alt_url
+            self._file_headers[filename] = alt_validators
+            return alt_raw, alt_url
         else:
             print(f"  Using primary source ({comparison_field}: {primary_value} >= {alt_value})")
-            return primary_data, primary_url
+            self._file_headers[filename] = primary_validators
+            return primary_raw, primary_url
+
 
+    async def _fetch(self, session, url, headers=None):
+        """Fetch a file body over the shared aiohttp session, hashing while streaming
 
-    def download_file(self, url, local_path, override_content=None):
+        Returns (content, hash, response_headers); content is None on HTTP 304.
+        """
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=30), headers=headers) as response:
+            if response.status == 304:
+                return None, None, response.headers
+            response.raise_for_status()
+            hasher = xxhash.xxh3_128()
+            chunks = []
+            async for chunk in response.content.iter_chunked(65536):
+                hasher.update(chunk)
+                chunks.append(chunk)
+            return b''.join(chunks), hasher.hexdigest(), response.headers
+
+    async def download_file(self, session, url, local_path, override_content=None):
         """Download a single file (or save override_content if provided)"""
         try:
+            rel_path = os.path.relpath(local_path, self.local_dir)
             if override_content is not None:
                 # Use provided content instead of downloading
                 content = override_content
                 if isinstance(content, dict):
-                    content = json.dumps(content, indent=2).encode('utf-8')
+                    content = orjson.dumps(content, option=orjson.OPT_INDENT_2)
+                new_hash = None
             else:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                content = response.content
-            
+                # Ask the server to skip the body if our copy is still current
+                headers = {}
+                prev = self._prev_files.get(rel_path)
+                if prev and os.path.exists(local_path):
+                    if prev.get('etag'):
+                        headers['If-None-Match'] = prev['etag']
+                    if prev.get('last_modified'):
+                        headers['If-Modified-Since'] = prev['last_modified']
+
+                content, new_hash, resp_headers = await self._fetch(session, url, headers or None)
+
+                if content is None:
+                    # 304 Not Modified - keep the local copy and its validators
+                    self._file_headers[rel_path] = {
+                        'etag': prev.get('etag'),
+                        'last_modified': prev.get('last_modified')
+                    }
+                    self._bump_stat('skipped')
+                    return False
+
+                self._file_headers[rel_path] = {
+                    'etag': resp_headers.get('ETag'),
+                    'last_modified': resp_headers.get('Last-Modified')
+                }
+
+            # Hand the disk write to a worker thread so the event loop keeps downloading
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.save_content, content, url, local_path, new_hash)
+
+        except Exception as e:
+            print(f"Error saving {local_path}: {e}")
+            self._bump_stat('errors')
+            return False
+
+    def save_content(self, content, url, local_path, new_hash=None):
+        """Save downloaded content to disk if it changed"""
+        try:
             # Validate file content (make sure it's not empty or error page)
             if len(content) == 0:
                 print(f"Skipping empty file: {url}")
-                self.stats['skipped'] += 1
+                self._bump_stat('skipped')
                 return False
-            
+
             # Create directory if needed
-            os.makedirs(os.path.dirname(local_path), exist_ok=True)
-            
-            # Check if file changed (compare hash)
-            new_hash = hashlib.md5(content).hexdigest()
-            old_hash = self.get_file_hash(local_path)
-            
+            self._ensure_dir(os.path.dirname(local_path))
+
+            # Check if file changed (compare size first, then hash)
+            if new_hash is None:
+                new_hash = xxhash.xxh3_128(content).hexdigest()
+            try:
+                old_size = os.path.getsize(local_path)
+            except OSError:
+                old_size = None
+            if old_size is None:
+                old_hash = None
+            elif old_size != len(content):
+                # Different size means different content - no need to hash the old copy
+                old_hash = 'size changed'
+            else:
+                old_hash = self.get_content_hash(local_path)
+
             if old_hash != new_hash:
-                with open(local_path, 'wb') as f:
+                # Write to a temp file and swap it in so readers never see a partial file
+                tmp_path = local_path + '.part'
+                with open(tmp_path, 'wb') as f:
                     f.write(content)
-                
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, local_path)
+                self._hash_cache[local_path] = hashlib.md5(content).hexdigest()
+
                 if old_hash is None:
                     print(f"Downloaded: {os.path.basename(local_path)} ({len(content)} bytes)")
-                    self.stats['downloaded'] += 1
+                    self._bump_stat('downloaded')
                 else:
                     print(f"Updated: {os.path.basename(local_path)} ({len(content)} bytes)")
-                    self.stats['updated'] += 1
+                    self._bump_stat('updated')
                 return True
             else:
-                self.stats['skipped'] += 1
+                self._bump_stat('skipped')
                 return False
                 
         except Exception as e:
             print(f"Error saving {local_path}: {e}")
-            self.stats['errors'] += 1
+            self._bump_stat('errors')
             return False
     
     def get_directory_listing(self, url):
         """Get list of files from directory listing"""
         try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Feed the listing into lxml's incremental parser as it streams in,
+            # so parsing overlaps the download and the body is never held whole
+            parser = lxml.etree.HTMLParser()
+            cached = self._listing_cache.pop(url, None)
+            if cached is not None:
+                # The availability probe already downloaded this page
+                parser.feed(cached)
+            else:
+                with self.session.get(url, timeout=30, stream=True) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(8192):
+                        parser.feed(chunk)
+            doc = parser.close()
             files = []
+            seen = set()
 
             # Look for links that appear to be files
-            for link in soup.find_all('a', href=True):
-                href = link['href']
+            for link in doc.iter('a'):
+                href = link.get('href')
+                if href is None:
+                    continue
 
                 # Skip parent directory links and fragments
-                if href in ['..', '../', '/', ''] or href.startswith('#'):
+                if href in self._SKIP_LINKS or href[:1] == '#':
                     continue
 
                 # Skip links that navigate up directories
-                if href.startswith('/') and not href.startswith(urlparse(self.base_url).path):
+                if href.startswith('/') and not href.startswith(self._base_path):
                     continue
 
                 # If it's a relative link, make it absolute
@@ -285,8 +502,10 @@ class DataMirror:
                 if not href.startswith(self.base_url):
                     continue
 
-                # Check if it looks like a file (has extension) or subdirectory
-                if '.' in os.path.basename(href) or href.endswith('/'):
+                # Check if it looks like a file (has extension) or subdirectory,
+                # skipping entries the page links more than once
+                if (href.endswith('/') or '.' in href.rsplit('/', 1)[-1]) and href not in seen:
+                    seen.add(href)
                     files.append(href)
 
             return files
@@ -295,46 +514,124 @@ class DataMirror:
             print(f"Error getting directory listing from {url}: {e}")
             return []
     
-    def mirror_directory(self, url, local_subdir=""):
-        """Recursively mirror a directory"""
-        # Safety check: never scan outside the base_url
-        if not url.startswith(self.base_url):
-            print(f"Skipping URL outside base path: {url}")
-            return
-
-        local_path = os.path.join(self.local_dir, local_subdir)
+    def _scan_directory(self, dir_url, dir_queue, tasks, lock):
+        """Scan one directory listing, queueing subdirs and collecting file tasks"""
+        print(f"Scanning: {dir_url}")
+        files = self.get_directory_listing(dir_url)
 
-        print(f"Scanning: {url}")
-        files = self.get_directory_listing(url)
-        
         if not files:
-            print(f"No files found in {url}")
+            print(f"No files found in {dir_url}")
             return
-        
+
         for file_url in files:
-            # Parse the file URL to get relative path
             parsed = urlparse(file_url)
-            rel_path = parsed.path.replace(urlparse(self.base_url).path, '').lstrip('/')
+
+            # Skip anything we've already queued or collected this run
+            normalized = parsed._replace(fragment='').geturl()
+            with lock:
+                if normalized in self._seen_urls:
+                    continue
+                self._seen_urls.add(normalized)
+
+            # Relative path comes straight from the parsed URL
+            path = parsed.path
+            if path.startswith(self._base_path):
+                rel_path = path[len(self._base_path):].lstrip('/')
+            else:
+                rel_path = path.lstrip('/')
             local_file_path = os.path.join(self.local_dir, rel_path)
             filename = os.path.basename(file_url)
-            
+
             if file_url.endswith('/'):
-                # It's a subdirectory, recurse
-                self.mirror_directory(file_url, rel_path)
+                # It's a subdirectory, hand it to another worker
+                if file_url.startswith(self.base_url):
+                    dir_queue.put(file_url)
+                else:
+                    print(f"Skipping URL outside base path: {file_url}")
             else:
                 # Check if this is a special file that needs comparison
                 if filename in ['mined_blocks_mainnet.json', 'mainnet_uniswap_v4_data.json', 'price_data_bwork_mainnetv2.json']:
                     best_data, best_url = self.compare_json_sources(filename)
                     if best_data is not None:
-                        self.files_found.append(best_url)
-                        self.download_file(best_url, local_file_path, override_content=best_data)
+                        with lock:
+                            self.files_found.append(best_url)
+                            tasks.append((best_url, local_file_path, best_data))
                     else:
-                        self.stats['errors'] += 1
+                        self._bump_stat('errors')
                 else:
                     # Regular file, download normally
-                    self.files_found.append(file_url)
-                    self.download_file(file_url, local_file_path)
-                    
+                    with lock:
+                        self.files_found.append(file_url)
+                        tasks.append((file_url, local_file_path, None))
+
+    def collect_file_tasks(self, url):
+        """Scan the directory tree with worker threads and collect download tasks
+
+        Listings for independent subdirectories are fetched concurrently,
+        so a deep tree costs roughly one round trip per level instead of
+        one per directory.
+        """
+        # Safety check: never scan outside the base_url
+        if not url.startswith(self.base_url):
+            print(f"Skipping URL outside base path: {url}")
+            return []
+
+        tasks = []
+        lock = threading.Lock()
+        dir_queue = queue.Queue()
+        dir_queue.put(url)
+        scanned = [0]
+
+        def worker():
+            while True:
+                dir_url = dir_queue.get()
+                if dir_url is None:
+                    dir_queue.task_done()
+                    return
+                try:
+                    self._scan_directory(dir_url, dir_queue, tasks, lock)
+                    with lock:
+                        scanned[0] += 1
+                except Exception as e:
+                    print(f"Error scanning {dir_url}: {e}")
+                    self._bump_stat('errors')
+                finally:
+                    dir_queue.task_done()
+
+        threads = [threading.Thread(target=worker) for _ in range(self._SCAN_WORKERS)]
+        for t in threads:
+            t.start()
+        dir_queue.join()
+        for _ in threads:
+            dir_queue.put(None)
+        for t in threads:
+            t.join()
+
+        print(f"Scanned {scanned[0]} directories, {len(tasks)} files to download")
+        return tasks
+
+    async def mirror_directory(self, url):
+        """Mirror a directory tree, downloading all discovered files concurrently"""
+        tasks = self.collect_file_tasks(url)
+        if not tasks:
+            return
+
+        # Cap sockets at the connector and in-flight downloads with a semaphore;
+        # keep idle connections warm for the whole download phase
+        connector = aiohttp.TCPConnector(limit=20, limit_per_host=10, keepalive_timeout=30)
+        semaphore = asyncio.Semaphore(20)
+
+        async def bounded_download(session, file_url, local_path, override_content):
+            async with semaphore:
+                await self.download_file(session, file_url, local_path, override_content)
+
+        async with aiohttp.ClientSession(connector=connector, headers=dict(self.session.headers)) as session:
+            await asyncio.gather(*(
+                bounded_download(session, file_url, local_path, override_content)
+                for file_url, local_path, override_content in tasks
+            ))
+
+
     def mirror_from_alt_source(self):
         """Mirror comparison files from alternative source when primary is down"""
         print("\nAttempting to update comparison files from alternative source...")
@@ -347,10 +644,10 @@ class DataMirror:
             
             try:
                 print(f"\nFetching {filename} from alternative source...")
-                response = self.session.get(alt_url, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-                
+                # Conditional fetch: a 304 reuses the local copy with no body
+                raw, data, validators = self._fetch_comparison_source(
+                    alt_url, filename, local_file_path)
+
                 # Get comparison value based on file structure
                 if filename == 'mainnet_uniswap_v4_data.json':
                     comp_value = data.get('metadata', {}).get('current_block', 'unknown')
@@ -364,25 +661,72 @@ class DataMirror:
                     comp_field = 'latest_block_number'
                 
                 print(f"  Alternative source: {comp_field} = {comp_value}")
-                
+
+                self._file_headers[filename] = validators
                 self.files_found.append(alt_url)
-                self.download_file(alt_url, local_file_path, override_content=data)
+                self.save_content(raw, alt_url, local_file_path)
                 
             except Exception as e:
                 print(f"  Error fetching {filename} from alternative source: {e}")
-                self.stats['errors'] += 1
+                self._bump_stat('errors')
 
 
     def create_status_file(self, success=True):
-        """Create status file for workflow"""
+        """Create status files for the workflow and for the next run's probes"""
         status = "SUCCESS" if success else "FAILED"
         with open("mirror_status.txt", "w") as f:
             f.write(status)
+        # Richer state for back-to-back runs; mirror_status.txt stays for
+        # backward compatibility with the workflow check
+        with open("mirror_status.json", "wb") as f:
+            f.write(orjson.dumps({
+                'ts': time.time(),
+                'primary': self.primary_available,
+                'alt': self.alt_available
+            }))
+
+    def load_recent_status(self, max_age=120):
+        """Reuse the previous run's availability probes if fresh and both passed
+
+        Returns True (and marks both sources available) only when the last
+        run probed both sources successfully within max_age seconds. If
+        either source was down we always re-probe so recovery is prompt.
+        """
+        try:
+            with open("mirror_status.json", "rb") as f:
+                status = orjson.loads(f.read())
+        except (OSError, ValueError):
+            return False
+        if time.time() - status.get('ts', 0) >= max_age:
+            return False
+        if status.get('primary') and status.get('alt'):
+            self.primary_available = True
+            self.alt_available = True
+            return True
+        return False
     
+    def _iter_data_files(self, dirpath=None):
+        """Yield (rel_path, full_path, stat_result) for every mirrored file via scandir
+
+        DirEntry.stat() reuses the data from the directory scan, so each
+        file costs one syscall instead of a separate stat per check.
+        """
+        if dirpath is None:
+            dirpath = self.local_dir
+        with os.scandir(dirpath) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._iter_data_files(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    if entry.name in ('index.json', 'README.md', '.hash_cache.json'):
+                        continue
+                    yield os.path.relpath(entry.path, self.local_dir), entry.path, entry.stat()
+
     def create_index(self):
         """Create an index file with metadata"""
         index_data = {
             'last_updated': datetime.utcnow().isoformat() + 'Z',
+            'hash_algorithm': 'md5',
             'source_url': self.base_url,
             'alternative_source_url': self.alt_base_url,
             'primary_available': self.primary_available,
@@ -391,35 +735,66 @@ class DataMirror:
             'files': []
         }
         
-        # Walk through all downloaded files
-        for root, dirs, files in os.walk(self.local_dir):
-            for file in files:
-                if file in ['index.json', 'README.md']:
-                    continue
-                    
-                filepath = os.path.join(root, file)
-                rel_path = os.path.relpath(filepath, self.local_dir)
-                
-                stat_info = os.stat(filepath)
-                index_data['files'].append({
-                    'path': rel_path,
-                    'size': stat_info.st_size,
-                    'modified': datetime.fromtimestamp(stat_info.st_mtime).isoformat() + 'Z',
-                    'md5': self.get_file_hash(filepath)
-                })
+        # Walk through all downloaded files, hashing in parallel threads
+        # (hashlib releases the GIL, so hashing overlaps with disk reads)
+        def hash_entry(e):
+            rel_path, filepath, stat_info = e
+            cached = self._hash_cache.get(filepath)
+            if cached:
+                return cached
+            prev = self._disk_hash_cache.get(rel_path)
+            if prev and prev.get('size') == stat_info.st_size and prev.get('mtime_ns') == stat_info.st_mtime_ns:
+                return prev['md5']
+            return self.get_file_hash(filepath)
+
+        entries = list(self._iter_data_files())
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            hashes = list(executor.map(hash_entry, entries))
+
+        new_hash_cache = {}
+        files_by_ext = {}
+        for (rel_path, filepath, stat_info), file_md5 in zip(entries, hashes):
+            new_hash_cache[rel_path] = {
+                'size': stat_info.st_size,
+                'mtime_ns': stat_info.st_mtime_ns,
+                'md5': file_md5
+            }
+            validators = self._file_headers.get(rel_path) or self._prev_files.get(rel_path) or {}
+            entry = {
+                'path': rel_path,
+                'size': stat_info.st_size,
+                'modified': datetime.fromtimestamp(stat_info.st_mtime).isoformat() + 'Z',
+                'md5': file_md5,
+                'etag': validators.get('etag'),
+                'last_modified': validators.get('last_modified')
+            }
+            # Comparison files also remember which source their copy came from
+            if validators.get('source_url'):
+                entry['source_url'] = validators['source_url']
+            index_data['files'].append(entry)
+
+            # Group by extension for the README in the same pass
+            ext = os.path.splitext(rel_path)[1] or 'no extension'
+            files_by_ext.setdefault(ext, []).append(entry)
         
-        # Save index
+        # Save index and the hash cache for the next run (atomically, like
+        # the mirrored files themselves)
         index_path = os.path.join(self.local_dir, 'index.json')
-        with open(index_path, 'w') as f:
-            json.dump(index_data, f, indent=2)
+        with open(index_path + '.part', 'wb') as f:
+            f.write(orjson.dumps(index_data, option=orjson.OPT_INDENT_2))
+        os.replace(index_path + '.part', index_path)
+
+        cache_path = os.path.join(self.local_dir, '.hash_cache.json')
+        with open(cache_path + '.part', 'wb') as f:
+            f.write(orjson.dumps(new_hash_cache))
+        os.replace(cache_path + '.part', cache_path)
             
-        # Create README
+        # Create README (assembled in memory, written in one call)
         readme_path = os.path.join(self.local_dir, 'README.md')
-        with open(readme_path, 'w') as f:
-            primary_status = "Available" if self.primary_available else "Unavailable"
-            alt_status = "Available" if self.alt_available else "Unavailable"
-            
-            f.write(f"""# Data Backup
+        primary_status = "Available" if self.primary_available else "Unavailable"
+        alt_status = "Available" if self.alt_available else "Unavailable"
+
+        parts = [f"""# Data Backup
 
 This directory contains a backup mirror of [{self.base_url}]({self.base_url})
 
@@ -446,21 +821,17 @@ This directory contains a backup mirror of [{self.base_url}]({self.base_url})
 - Total Files in Backup: {len(index_data['files'])}
 
 ## Files in Backup
-""")
-            
-            # Group files by extension
-            files_by_ext = {}
-            for file_info in index_data['files']:
-                ext = os.path.splitext(file_info['path'])[1] or 'no extension'
-                if ext not in files_by_ext:
-                    files_by_ext[ext] = []
-                files_by_ext[ext].append(file_info)
-            
-            for ext in sorted(files_by_ext.keys()):
-                f.write(f"\n### {ext.upper()} Files\n")
-                for file_info in sorted(files_by_ext[ext], key=lambda x: x['path']):
-                    size_kb = file_info['size'] / 1024
-                    f.write(f"- [`{file_info['path']}`]({file_info['path']}) ({size_kb:.1f} KB)\n")
+"""]
+
+        for ext in sorted(files_by_ext.keys()):
+            parts.append(f"\n### {ext.upper()} Files\n")
+            parts.extend(
+                f"- [`{file_info['path']}`]({file_info['path']}) ({file_info['size'] / 1024:.1f} KB)\n"
+                for file_info in sorted(files_by_ext[ext], key=itemgetter('path'))
+            )
+
+        with open(readme_path, 'w') as f:
+            f.write(''.join(parts))
 
 def main():
     mirror = DataMirror()
@@ -471,22 +842,26 @@ def main():
     print(f"Target: {mirror.local_dir}/")
     print("-" * 60)
     
-    # Test both server availability
+    # Test both server availability (skipped when a recent run already
+    # probed both sources successfully)
     print("\nTesting source availability...")
-    print("Primary source:")
-    mirror.primary_available = mirror.test_server_availability(
-        mirror.base_url, 
-        "Primary source",
-        is_github_pages=False
-    )
-    
-    print("\nAlternative source:")
-    mirror.alt_available = mirror.test_server_availability(
-        mirror.alt_base_url, 
-        "Alternative source",
-        is_github_pages=True
-    )
-    
+    if mirror.load_recent_status():
+        print("Recent probe found both sources available - skipping checks")
+    else:
+        print("Primary source:")
+        mirror.primary_available = mirror.test_server_availability(
+            mirror.base_url,
+            "Primary source",
+            is_github_pages=False
+        )
+
+        print("\nAlternative source:")
+        mirror.alt_available = mirror.test_server_availability(
+            mirror.alt_base_url,
+            "Alternative source",
+            is_github_pages=True
+        )
+
     # Check if we can proceed
     if not mirror.primary_available and not mirror.alt_available:
         print("\nBoth sources are unavailable")
@@ -500,7 +875,7 @@ def main():
     # If primary is available, do full mirror
     if mirror.primary_available:
         print("\nPrimary source available - performing full mirror")
-        mirror.mirror_directory(mirror.base_url)
+        asyncio.run(mirror.mirror_directory(mirror.base_url))
     else:
         print("\nPrimary source unavailable - attempting partial update from alternative source")
         mirror.mirror_from_alt_source()